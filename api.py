@@ -1,34 +1,30 @@
 # api.py (DEFINITIVE, SELF-CONTAINED VERSION)
 
 import asyncio
+import multiprocessing
+import threading
+import time
 import uuid
 import datetime
 import platform
 import subprocess
 import yaml
 import json
+import numpy as np
 from pathlib import Path
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Literal
 
-# --- Self-Contained Backend Definitions ---
-# By defining these here, the API is robust and independent of the runner.
-from lsm_py.lsm_pricer import price_american_put_lsm
-from lsm_py.lsm_numba import price_american_put_lsm_numba
-from lsm_cpp.lsm_cpp_backend import (
-    price_american_put_lsm_cpp, price_american_put_lsm_arena,
-    price_american_put_lsm_simd, price_american_put_lsm_mp,
-    price_american_put_lsm_ultimate
-)
-
-BACKENDS = {
-    "py": price_american_put_lsm, "numba": price_american_put_lsm_numba,
-    "cpp": price_american_put_lsm_cpp, "cpp_arena": price_american_put_lsm_arena,
-    "cpp_simd": price_american_put_lsm_simd, "cpp_mp": price_american_put_lsm_mp,
-    "cpp_ultimate": price_american_put_lsm_ultimate,
-}
+# --- Backend Definitions ---
+# The dispatch table is shared with the benchmark runner.
+from lsm_py.backends import BACKENDS, DESCRIPTIVE_NAMES
+from lsm_py.lsm_numba import WorkArena, warm_up as warm_up_numba
 
 # --- Pydantic Models (Unchanged) ---
 class OptionParams(BaseModel): S0: float = 100.0; K: float = 105.0; T: float = 1.0; r: float = 0.05; sigma: float = 0.2
@@ -40,10 +36,38 @@ class ExperimentConfig(BaseModel): option_params: OptionParams; simulation_param
 tasks: Dict[str, Dict[str, Any]] = {}
 
 # --- App Configuration ---
-app = FastAPI(title="LSM Workbench API", version="2.0.0")
+app = FastAPI(title="LSM Workbench API", version="2.0.0", default_response_class=ORJSONResponse)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 PROJECT_ROOT = Path(__file__).resolve().parent
 
+# Backend runs are dispatched to a worker process so that pure-Python backends do not hold
+# the server's GIL. Runs stay serial (one worker) so they never compete for cores and the
+# recorded time_ms is a clean measurement. The worker is spawned rather than forked (the
+# pool is started from a background thread) and compiles the Numba backend on start-up, or
+# loads it from its on-disk JIT cache, instead of on the first experiment request.
+# Experiments run on Starlette's threadpool, so the pool is created and replaced under a lock;
+# otherwise two tasks started together could each create a pool and run at the same time.
+executor: ProcessPoolExecutor | None = None
+executor_lock = threading.Lock()
+
+def get_executor() -> ProcessPoolExecutor:
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=warm_up_numba)
+        return executor
+
+def discard_executor(pool: ProcessPoolExecutor):
+    # A worker that died (e.g. a segfault in a native backend) leaves the pool unusable;
+    # drop it so the next run starts a fresh one. Only the broken pool itself is dropped,
+    # in case another task has already replaced it with a healthy one.
+    global executor
+    with executor_lock:
+        if executor is pool:
+            executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
 # --- Helper Function ---
 def get_system_info() -> dict:
     try:
@@ -52,16 +76,62 @@ def get_system_info() -> dict:
         commit_hash = "N/A"
     return {"python_version": platform.python_version(), "os": platform.system(), "git_commit": commit_hash}
 
+# The commit and platform cannot change within a server process, so shell out to git once
+# at import instead of at the start of every experiment.
+SYSTEM_INFO = get_system_info()
+
+@lru_cache(maxsize=1)
+def get_numba_arena(num_paths: int, num_steps: int) -> WorkArena:
+    """
+    The Numba work arena for the most recent (num_paths, num_steps), kept in the worker process.
+    Only one is held, since a large arena is hundreds of MB; a new shape releases the old one.
+    """
+    return WorkArena(num_paths, num_steps)
+
+def run_backend_timed(backend_name: str, S0: float, K: float, T: float, r: float, sigma: float,
+                      num_paths: int, num_steps: int, seed: int) -> tuple:
+    """Runs one backend and returns (price, time_ms). Executed in a worker process."""
+    kwargs = dict(S0=S0, K=K, T=T, r=r, sigma=sigma, num_paths=num_paths, num_steps=num_steps, seed=seed)
+    start_time = time.perf_counter()
+    if backend_name == "numba":
+        # Runs with the same shape (e.g. a sweep over K or sigma) reuse the same buffers
+        kwargs["arena"] = get_numba_arena(num_paths, num_steps)
+    price = BACKENDS[backend_name](**kwargs)
+    end_time = time.perf_counter()
+    # Cast NumPy scalars to a plain float so the result serializes with orjson
+    return float(price), (end_time - start_time) * 1000
+
+# With a fixed seed the pricers are pure functions of their inputs, so successful runs are
+# memoized by (backend_name, S0, K, T, r, sigma, num_paths, num_steps, seed) -> (price, time_ms).
+# Failed runs are never cached, so they are retried on the next request.
+RESULT_CACHE_SIZE = 1024
+result_cache: Dict[tuple, tuple] = {}
+
+def cache_result(key: tuple, outputs: tuple):
+    if len(result_cache) >= RESULT_CACHE_SIZE:
+        # Dicts keep insertion order, so this evicts the oldest entry
+        result_cache.pop(next(iter(result_cache)))
+    result_cache[key] = outputs
+
+def make_result(backend_name: str, args: dict, price: float, duration_ms: float, cached: bool) -> dict:
+    # Cached rows carry the timing of the original run, not a fresh measurement
+    return {
+        "case_name": "dynamic_run", "backend": backend_name, "timestamp_utc": datetime.datetime.utcnow().isoformat(),
+        "inputs": args, "outputs": {"price": price, "time_ms": duration_ms}, "cached": cached
+    }
+
 # --- Core Experiment Logic (Unchanged) ---
 # In api.py
 
 # ... (keep all imports, Pydantic models, tasks dict, app setup, etc.) ...
 
 # --- The Core Experiment Logic (DEFINITIVELY CORRECTED) ---
-def do_run_experiment(task_id: str, config: ExperimentConfig):
+def run_experiment_task(task_id: str, config: ExperimentConfig):
     tasks[task_id]['status'] = 'RUNNING'
-    results = []
-    system_info = get_system_info()
+    # system_info is stored once per task rather than repeated in every result row.
+    # Results are appended as they complete so pollers can fetch them incrementally.
+    tasks[task_id]['system_info'] = SYSTEM_INFO
+    results = tasks[task_id]['results'] = []
 
     # Define which parameters belong to which model for robust updating
     sim_params_keys = SimulationParams.model_fields.keys()
@@ -72,50 +142,81 @@ def do_run_experiment(task_id: str, config: ExperimentConfig):
     if sweep_param and config.sweep:
         # Ensure step count is at least 2 for a valid range
         steps = max(2, config.sweep.steps)
-        sweep_values = [config.sweep.start + i * (config.sweep.end - config.sweep.start) / (steps - 1) for i in range(steps)]
+        sweep_values = np.linspace(config.sweep.start, config.sweep.end, steps)
+        # Integer parameters are truncated in one shot, as int() would do per value
+        if sweep_param in ['num_paths', 'num_steps', 'seed']:
+            sweep_values = sweep_values.astype(np.int64)
+        sweep_values = sweep_values.tolist()
     else:
         sweep_values = [None] # This ensures the loop runs exactly once for non-sweep runs
 
-    total_runs = len(sweep_values) * len(config.backends)
-    run_count = 0
-
+    # Build every (sweep value, backend) run up front. Runs found in the result cache are
+    # answered immediately; the rest are grouped by key so identical runs are computed once.
+    cached_runs: List[tuple] = []
+    pending: Dict[tuple, List[tuple]] = {}
     for i, sweep_val in enumerate(sweep_values):
         sim_params = config.simulation_params.model_copy()
         opt_params = config.option_params.model_copy()
 
         if sweep_param and sweep_val is not None:
-            # Safely determine if the value should be an int or float
-            is_int = sweep_param in ['num_paths', 'num_steps', 'seed']
-            val_to_set = int(sweep_val) if is_int else sweep_val
-            
             # Robustly set the swept parameter on the correct model
             if sweep_param in sim_params_keys:
-                setattr(sim_params, sweep_param, val_to_set)
+                setattr(sim_params, sweep_param, sweep_val)
             elif sweep_param in opt_params_keys:
-                setattr(opt_params, sweep_param, val_to_set)
+                setattr(opt_params, sweep_param, sweep_val)
 
         for backend_name in config.backends:
-            run_count += 1
-            tasks[task_id]['progress'] = f"Running {run_count}/{total_runs} ({backend_name})"
-
             if backend_name not in BACKENDS: continue
             
             args = {**opt_params.model_dump(), **sim_params.model_dump()}
-            
-            import time
-            start_time = time.perf_counter()
-            price = BACKENDS[backend_name](**args)
-            end_time = time.perf_counter()
-            duration_ms = (end_time - start_time) * 1000
-
-            result = {
-                "case_name": "dynamic_run", "backend": backend_name, "timestamp_utc": datetime.datetime.utcnow().isoformat(),
-                "inputs": args, "outputs": {"price": price, "time_ms": duration_ms}, "system_info": system_info
-            }
-            results.append(result)
-
-    tasks[task_id]['status'] = 'COMPLETED'
-    tasks[task_id]['results'] = results
+            key = (backend_name, *args.values())
+            if key in result_cache:
+                cached_runs.append((backend_name, args, result_cache[key]))
+            else:
+                pending.setdefault(key, []).append((backend_name, args))
+
+    total_runs = len(cached_runs) + sum(len(runs) for runs in pending.values())
+    for backend_name, args, (price, duration_ms) in cached_runs:
+        results.append(make_result(backend_name, args, price, duration_ms, cached=True))
+    run_count = len(cached_runs)
+    tasks[task_id]['progress'] = f"Running {run_count}/{total_runs}"
+
+    pool = get_executor()
+    futures = {pool.submit(run_backend_timed, *key): key for key in pending}
+
+    # Collect results in completion order; the frontend orders them by sweep value.
+    # A failing run is recorded and the remaining runs are still collected.
+    errors: List[str] = []
+    for future in as_completed(futures):
+        key = futures[future]
+        try:
+            price, duration_ms = future.result()
+        except BrokenProcessPool as e:
+            discard_executor(pool)
+            errors.append(f"{key[0]}: worker process died ({e})")
+            continue
+        except Exception as e:
+            errors.append(f"{key[0]}: {e!r}")
+            continue
+        cache_result(key, (price, duration_ms))
+        for backend_name, args in pending[key]:
+            run_count += 1
+            tasks[task_id]['progress'] = f"Running {run_count}/{total_runs} ({backend_name})"
+            results.append(make_result(backend_name, args, price, duration_ms, cached=False))
+
+    if errors:
+        tasks[task_id]['error'] = "; ".join(errors)
+        tasks[task_id]['status'] = 'FAILED'
+    else:
+        tasks[task_id]['status'] = 'COMPLETED'
+
+def do_run_experiment(task_id: str, config: ExperimentConfig):
+    # Any unexpected error must still end the task, otherwise pollers wait on RUNNING forever
+    try:
+        run_experiment_task(task_id, config)
+    except Exception as e:
+        tasks[task_id]['error'] = repr(e)
+        tasks[task_id]['status'] = 'FAILED'
     
 # ... (the rest of the file, including endpoints, is correct) ...
 
@@ -129,18 +230,15 @@ def run_experiment(config: ExperimentConfig, background_tasks: BackgroundTasks):
     return {"task_id": task_id}
 
 @app.get("/task-status/{task_id}")
-def get_task_status(task_id: str):
+def get_task_status(task_id: str, since: int = Query(0, ge=0)):
     if task_id not in tasks: raise HTTPException(status_code=404, detail="Task not found")
-    return tasks[task_id]
+    # Only send the results the client has not seen yet (results[since:])
+    task = tasks[task_id]
+    results = task["results"]
+    return {**task, "results": results[since:] if results is not None else None}
 
 @app.get("/backends")
 def get_available_backends():
     # --- Using Descriptive Names in the API ---
-    # This addresses your other point perfectly. The API will now send the clean names.
-    backend_name_map = {
-        "py": "Python (NumPy)", "numba": "Numba (JIT)", "cpp": "C++ (Scalar)",
-        "cpp_arena": "C++ (Scalar + Arena)", "cpp_simd": "C++ (SIMD)",
-        "cpp_mp": "C++ (MP + Arena)", "cpp_ultimate": "C++ (MP + SIMD + Arena)"
-    }
     # We send both the key and the descriptive name to the frontend
-    return [{"key": k, "name": v} for k, v in backend_name_map.items() if k in BACKENDS]
\ No newline at end of file
+    return [{"key": k, "name": v} for k, v in DESCRIPTIVE_NAMES.items() if k in BACKENDS]
\ No newline at end of file
@@ -16,17 +16,9 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 # when running as a script. However, when running with python -m, this might not be necessary,
 # but it provides robustness. Let's first try to fix the file paths and keep imports simple.
 
-from lsm_py.lsm_pricer import price_american_put_lsm
-from lsm_py.lsm_numba import price_american_put_lsm_numba # <--- ADD THIS
-
-# ADD THIS IMPORT
-from lsm_cpp.lsm_cpp_backend import price_american_put_lsm_cpp, price_american_put_lsm_simd, price_american_put_lsm_arena, price_american_put_lsm_mp, price_american_put_lsm_ultimate
-
-# This dictionary acts as a dispatcher. The key is the backend name from the
+# BACKENDS is the shared dispatcher: the key is the backend name from the
 # YAML file, and the value is the function to call.
-BACKENDS = {
-    "py": price_american_put_lsm, "numba": price_american_put_lsm_numba, "cpp": price_american_put_lsm_cpp, "cpp_arena": price_american_put_lsm_arena, "cpp_simd": price_american_put_lsm_simd, "cpp_mp": price_american_put_lsm_mp, "cpp_ultimate": price_american_put_lsm_ultimate
-}
+from lsm_py.backends import BACKENDS
 
 def get_git_commit_hash() -> str:
     """Gets the current git commit hash to ensure reproducibility."""
@@ -78,37 +78,45 @@ def binomial_tree_american_vanilla(
     discount = np.exp(-r * dt)
 
     # --- 2. Initialize option values at maturity (time N) ---
-    # There are N+1 possible outcomes at maturity.
-    V = np.zeros(N + 1)
-    for j in range(N + 1):
-        price_at_maturity = S * (u**j) * (d**(N - j))
-        if option_type == 'put':
-            V[j] = max(0, K - price_at_maturity)
-        else:  # 'call'
-            V[j] = max(0, price_at_maturity - K)
+    # There are N+1 possible outcomes at maturity: S * u**j * d**(N - j) for j = 0..N,
+    # built with O(N) work as S * d**N * (u/d)**j.
+    prices = S * d**N * (u / d) ** np.arange(N + 1)
+    if option_type == 'put':
+        V = np.maximum(0.0, K - prices)
+    else:  # 'call'
+        V = np.maximum(0.0, prices - K)
 
     # --- 3. Backward induction from time N-1 down to 0 ---
-    # V holds the values from the next time step (i+1).
-    # We calculate the values for the current time step (i) and store them in a new array.
+    # V[:i+2] holds the values from the next time step (i+1). Each step overwrites V[:i+1]
+    # in place with a handful of NumPy kernels, so nothing is allocated inside the loop.
+    # The discount is folded into the risk-neutral weights.
+    p_up = discount * q
+    p_down = discount * (1 - q)
+    up_value = np.empty(N)
+    exercise = np.empty(N)
     for i in range(N - 1, -1, -1):
-        # At time i, there are i+1 nodes.
-        V_current_step = np.zeros(i + 1)
-        for j in range(i + 1):
-            # The continuation value is calculated from the two possible future nodes in V.
-            continuation = discount * (q * V[j + 1] + (1 - q) * V[j])
-            
-            # The exercise value is calculated at the current node (i, j).
-            price_at_node = S * (u**j) * (d**(i - j))
-            if option_type == 'put':
-                exercise = max(0, K - price_at_node)
-            else:  # 'call'
-                exercise = max(0, price_at_node - K)
-            
-            # The option's value at this node is the max of holding or exercising.
-            V_current_step[j] = max(continuation, exercise)
-        
-        # The calculated values for this step become the future values for the previous step.
-        V = V_current_step
+        n = i + 1
+        # The node prices at time i follow from those at time i+1 by a single multiply:
+        # S * u**j * d**(i+1-j) * u = S * u**j * d**(i-j), since d = 1/u.
+        prices_i = prices[:n]
+        prices_i *= u
+
+        # The continuation value is calculated from the two possible future nodes in V.
+        # The up-move term is computed before V[:n] is overwritten.
+        np.multiply(V[1:n + 1], p_up, out=up_value[:n])
+        V_i = V[:n]
+        V_i *= p_down
+        V_i += up_value[:n]
+
+        # The exercise value is calculated at the current nodes (i, j).
+        if option_type == 'put':
+            np.subtract(K, prices_i, out=exercise[:n])
+        else:  # 'call'
+            np.subtract(prices_i, K, out=exercise[:n])
+
+        # The option's value at each node is the max of holding or exercising.
+        # The continuation value is never negative, so the payoff needs no clamp at zero.
+        np.maximum(V_i, exercise[:n], out=V_i)
 
-    # After the loop, V will be an array with a single element: the price at time 0.
+    # After the loop, V[0] holds the price at time 0.
     return V[0]
\ No newline at end of file
@@ -0,0 +1,26 @@
+# lsm_py/backends.py
+
+from lsm_py.lsm_pricer import price_american_put_lsm
+from lsm_py.lsm_numba import price_american_put_lsm_numba
+from lsm_cpp.lsm_cpp_backend import (
+    price_american_put_lsm_cpp, price_american_put_lsm_arena,
+    price_american_put_lsm_simd, price_american_put_lsm_mp,
+    price_american_put_lsm_ultimate
+)
+
+# This dictionary acts as a dispatcher shared by the benchmark runner and the API.
+# The key is the backend name used in experiments.yml and API requests, and the
+# value is the function to call.
+BACKENDS = {
+    "py": price_american_put_lsm, "numba": price_american_put_lsm_numba,
+    "cpp": price_american_put_lsm_cpp, "cpp_arena": price_american_put_lsm_arena,
+    "cpp_simd": price_american_put_lsm_simd, "cpp_mp": price_american_put_lsm_mp,
+    "cpp_ultimate": price_american_put_lsm_ultimate,
+}
+
+# Human-readable backend names, as shown in the UI
+DESCRIPTIVE_NAMES = {
+    "py": "Python (NumPy)", "numba": "Numba (JIT)", "cpp": "C++ (Scalar)",
+    "cpp_arena": "C++ (Scalar + Arena)", "cpp_simd": "C++ (SIMD)",
+    "cpp_mp": "C++ (MP + Arena)", "cpp_ultimate": "C++ (MP + SIMD + Arena)",
+}
@@ -1,42 +1,130 @@
 # lsm_py/lsm_numba.py
 
 import numpy as np
-from numba import njit
+from numba import njit, prange
 
-@njit
-def polyval_numba(p, x):
+@njit(parallel=True, fastmath=True, cache=True, boundscheck=False)
+def itm_moments_numba(S_t, t, K, exercise_t, exercise_cf, discount_pow):
     """
-    A Numba-compatible implementation of np.polyval.
-    Evaluates a polynomial at points x.
-    p is an array of coefficients, from highest degree to lowest.
+    Fused regression kernel for one LSM time step.
+    S_t holds the stock price of every path at time step t.
+    In a single pass over the paths it selects the in-the-money paths, forms the
+    scaled basis x = S/K and the discounted future cash flow y, and accumulates the power sums
+    of x and the cross-moments with y. Nothing is gathered or materialised per path.
+    Returns the number of ITM paths and the normal equations (ATA, ATy) of the degree-2 fit,
+    with coefficients ordered from highest degree to lowest, like np.polyfit.
     """
-    # Get the degree of the polynomial from the length of the coefficient array
-    deg = len(p) - 1
-    # Initialize the result array with zeros
-    y = np.zeros_like(x)
-    # Iterate through the coefficients and powers of x
-    for i in range(deg + 1):
-        y += p[i] * x**(deg - i)
-    return y
+    inv_K = 1.0 / K
+    n_itm = 0
+    sx = 0.0
+    sx2 = 0.0
+    sx3 = 0.0
+    sx4 = 0.0
+    sy = 0.0
+    sxy = 0.0
+    sx2y = 0.0
+    for i in prange(S_t.size):
+        if S_t[i] < K:
+            x = S_t[i] * inv_K
+            x2 = x * x
+            y = exercise_cf[i] * discount_pow[exercise_t[i] - t]
+            n_itm += 1
+            sx += x
+            sx2 += x2
+            sx3 += x2 * x
+            sx4 += x2 * x2
+            sy += y
+            sxy += x * y
+            sx2y += x2 * y
 
-@njit
-def polyfit_numba(x, y, deg):
+    ATA = np.array([
+        [sx4, sx3, sx2],
+        [sx3, sx2, sx],
+        [sx2, sx, float(n_itm)],
+    ])
+    ATy = np.array([sx2y, sxy, sy])
+    return n_itm, ATA, ATy
+
+class WorkArena:
     """
-    A Numba-compatible implementation of a simple polynomial fit (least-squares).
-    This replaces np.polyfit, which is not supported in nopython mode.
+    Preallocated work buffers for price_american_put_lsm_numba.
+    An arena can be reused across calls with the same (num_paths, num_steps), e.g. a sweep
+    over K or sigma, which saves re-allocating the path matrices on every call.
     """
-    A = np.zeros((len(x), deg + 1))
-    for i in range(deg + 1):
-        A[:, i] = x**(deg - i)
-        
-    ATA = A.T @ A
-    ATy = A.T @ y
+
+    def __init__(self, num_paths: int, num_steps: int):
+        self.num_paths = num_paths
+        self.num_steps = num_steps
+        self.Z = np.empty((num_steps, num_paths))
+        self.S = np.empty((num_steps + 1, num_paths))
+        self.exercise_t = np.empty(num_paths, dtype=np.int64)
+        self.exercise_cf = np.empty(num_paths)
+
+@njit(parallel=True, fastmath=True, cache=True, boundscheck=False)
+def _price_american_put_lsm_numba(S0, K, T, r, sigma, num_paths, num_steps, seed, Z, S, exercise_t, exercise_cf):
+    """
+    Numba kernel behind price_american_put_lsm_numba. All path-sized buffers are passed in
+    and fully overwritten, so they can come from a reused WorkArena.
+    """
+    dt = T / num_steps
+    drift = (r - 0.5 * sigma**2) * dt
+    vol_sqrt_dt = sigma * np.sqrt(dt)
+    
+    # The normals are drawn serially so the result only depends on the seed,
+    # not on the number of threads.
+    np.random.seed(seed)
+    for t in range(num_steps):
+        for i in range(num_paths):
+            Z[t, i] = np.random.standard_normal()
     
-    coeffs = np.linalg.solve(ATA, ATy)
+    # Paths are stored time-major, shape (num_steps + 1, num_paths), so that every
+    # backward-induction step reads a contiguous row S[t].
+    # Each path is independent: walk it forward keeping its log price in a register.
+    log_S0 = np.log(S0)
+    for i in prange(num_paths):
+        log_S = log_S0
+        S[0, i] = S0
+        for t in range(1, num_steps + 1):
+            log_S += drift + vol_sqrt_dt * Z[t - 1, i]
+            S[t, i] = np.exp(log_S)
+
+    # discount_pow[k] is the discount factor over k time steps
+    discount_pow = np.exp(-r * dt * np.arange(num_steps + 2))
+    
+    # After backward induction each path has at most one non-zero cash flow, so instead of a
+    # full cash flow matrix we keep the exercise time and cash flow of every path.
+    # Initially, we assume exercise at maturity for all paths.
+    for i in prange(num_paths):
+        exercise_t[i] = num_steps
+        exercise_cf[i] = max(0.0, K - S[num_steps, i])
+    
+    inv_K = 1.0 / K
+    for t in range(num_steps - 1, 0, -1):
+        # Regression on the in-the-money paths, fused into a single pass over S[:, t]
+        n_itm, ATA, ATy = itm_moments_numba(S[t], t, K, exercise_t, exercise_cf, discount_pow)
+        
+        if n_itm == 0:
+            continue
+            
+        # lstsq rather than solve: with fewer than three ITM paths ATA is singular
+        c2, c1, c0 = np.linalg.lstsq(ATA, ATy)[0]
+        
+        # Exercise wherever the intrinsic value beats the fitted continuation value
+        for i in prange(num_paths):
+            exercise_value = K - S[t, i]
+            if exercise_value > 0.0:
+                x = S[t, i] * inv_K
+                if exercise_value > c0 + x * (c1 + x * c2):
+                    exercise_t[i] = t
+                    exercise_cf[i] = exercise_value
+
+    total = 0.0
+    for i in prange(num_paths):
+        total += exercise_cf[i] * discount_pow[exercise_t[i]]
+    price = total / num_paths
     
-    return coeffs
+    return price
 
-@njit
 def price_american_put_lsm_numba(
     S0: float,
     K: float,
@@ -46,57 +134,28 @@ def price_american_put_lsm_numba(
     num_paths: int,
     num_steps: int,
     seed: int = 42,
+    arena: WorkArena = None,
 ) -> float:
     """
     Prices an American put option using the Longstaff-Schwartz Monte Carlo (LSM) algorithm.
-    This version is accelerated with Numba's @njit decorator.
+    This version is accelerated with Numba's @njit decorator and parallelised over paths.
+    If an arena is given, its buffers are reused instead of allocating new ones;
+    it must have been created for the same num_paths and num_steps.
     """
-    dt = T / num_steps
-    
-    np.random.seed(seed)
-    Z = np.random.standard_normal((num_paths, num_steps))
+    if arena is None:
+        arena = WorkArena(num_paths, num_steps)
+    elif (arena.num_paths, arena.num_steps) != (num_paths, num_steps):
+        raise ValueError("arena was allocated for a different num_paths/num_steps")
     
-    S = np.zeros((num_paths, num_steps + 1))
-    S[:, 0] = S0
-    
-    for t in range(1, num_steps + 1):
-        S[:, t] = S[:, t - 1] * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z[:, t - 1])
-
-    intrinsic_value = np.maximum(0.0, K - S)
-    cash_flows = np.zeros((num_paths, num_steps + 1))
-    cash_flows[:, -1] = intrinsic_value[:, -1]
-    
-    for t in range(num_steps - 1, 0, -1):
-        in_the_money_paths = np.where(intrinsic_value[:, t] > 0)[0]
-        
-        if len(in_the_money_paths) == 0:
-            continue
-            
-        X = S[in_the_money_paths, t]
-        
-        future_discounted_cash_flows = np.zeros(len(in_the_money_paths))
-        for i in range(len(in_the_money_paths)):
-            path_idx = in_the_money_paths[i]
-            for j in range(t + 1, num_steps + 1):
-                if cash_flows[path_idx, j] > 0:
-                    future_discounted_cash_flows[i] = cash_flows[path_idx, j] * np.exp(-r * (j - t) * dt)
-                    break
-        Y = future_discounted_cash_flows
-        
-        coeffs = polyfit_numba(X, Y, 2)
-        
-        # --- THE FIX IS HERE ---
-        # Replace the unsupported np.polyval with our new Numba-compatible version
-        continuation_value = polyval_numba(coeffs, X)
-        
-        exercise_paths = in_the_money_paths[intrinsic_value[in_the_money_paths, t] > continuation_value]
-        
-        if len(exercise_paths) > 0:
-            cash_flows[exercise_paths, t] = intrinsic_value[exercise_paths, t]
-            cash_flows[exercise_paths, t + 1 :] = 0.0
+    # Normalise the argument types so every call hits the same compiled specialisation
+    return _price_american_put_lsm_numba(
+        float(S0), float(K), float(T), float(r), float(sigma), int(num_paths), int(num_steps), int(seed),
+        arena.Z, arena.S, arena.exercise_t, arena.exercise_cf,
+    )
 
-    discount_factors = np.exp(-r * np.arange(num_steps + 1) * dt)
-    discounted_cash_flows = np.sum(cash_flows * discount_factors, axis=1)
-    price = np.mean(discounted_cash_flows)
-    
-    return price
\ No newline at end of file
+def warm_up():
+    """
+    Compiles the Numba pricer (or loads it from the on-disk cache) using a tiny problem,
+    so that the first real call does not pay the JIT start-up cost.
+    """
+    price_american_put_lsm_numba(100.0, 105.0, 1.0, 0.05, 0.2, 8, 2, 42)
@@ -1,6 +1,15 @@
 # lsm_py/lsm_pricer.py
 
 import numpy as np
+import numpy.typing as npt
+
+# Number of paths processed together in the backward induction. A block's slice of the
+# current time step plus its float64 regression temporaries (~1 MB) fits in a typical L2 cache.
+BLOCK_SIZE = 32768
+
+# Never-in-the-money paths are dropped before the backward pass only when the fraction of
+# paths that do go in the money is below this; above it the copy costs more than it saves.
+ITM_COMPRESS_THRESHOLD = 0.5
 
 def price_american_put_lsm(
     S0: float,
@@ -11,6 +20,8 @@ def price_american_put_lsm(
     num_paths: int,
     num_steps: int,
     seed: int = 42,
+    dtype: npt.DTypeLike = np.float64,
+    sampler: str = "pseudo",
 ) -> float:
     """
     Prices an American put option using the Longstaff-Schwartz Monte Carlo (LSM) algorithm.
@@ -24,92 +35,149 @@ def price_american_put_lsm(
         num_paths: The number of Monte Carlo simulation paths.
         num_steps: The number of time steps for the simulation.
         seed: Seed for the random number generator for reproducibility.
+        dtype: Floating point type of the simulated paths and cash flows (np.float64 or np.float32).
+            float32 halves the memory traffic of path generation; the regression and the final
+            average are always computed in float64.
+        sampler: How the normal draws are generated:
+            'pseudo' - independent pseudo-random normals (default).
+            'antithetic' - half the paths use -Z of the other half, which reduces variance at no extra cost.
+            'sobol' - scrambled Sobol' quasi-random points (one dimension per time step) mapped
+                through the normal inverse CDF. num_paths must be a power of two, which keeps
+                the point set balanced; scipy is only imported when this sampler is used.
 
     Returns:
         The estimated price of the American put option.
     """
+    if sampler not in ["pseudo", "antithetic", "sobol"]:
+        raise ValueError("sampler must be 'pseudo', 'antithetic' or 'sobol'")
+    if sampler == "sobol" and (num_paths < 1 or num_paths & (num_paths - 1)):
+        raise ValueError("num_paths must be a power of two for the 'sobol' sampler")
+
     # --- 1. Path Simulation ---
     dt = T / num_steps
     rng = np.random.default_rng(seed)
     
-    # Generate standard normal random variables for all paths and steps at once
-    Z = rng.standard_normal(size=(num_paths, num_steps))
+    # GBM drift and diffusion per time step
+    drift = (r - 0.5 * sigma**2) * dt
+    vol_sqrt_dt = sigma * np.sqrt(dt)
     
-    # Pre-allocate array for stock paths
-    # Shape: (num_paths, num_steps + 1) to include the initial price S0
-    S = np.zeros((num_paths, num_steps + 1))
-    S[:, 0] = S0
+    # Pre-allocate array for stock paths in time-major layout.
+    # Shape: (num_steps + 1, num_paths) so that each time step is a contiguous row.
+    S = np.empty((num_steps + 1, num_paths), dtype=dtype)
     
-    # Use the exact solution for Geometric Brownian Motion
-    for t in range(1, num_steps + 1):
-        S[:, t] = S[:, t - 1] * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z[:, t - 1])
+    # Use the exact solution for Geometric Brownian Motion: log(S) is a cumulative
+    # sum of i.i.d. log-returns. The normals are drawn straight into the path buffer
+    # and turned into log-returns in place, so no separate Z matrix is allocated.
+    log_increments = S[1:]
+    if sampler == "pseudo":
+        rng.standard_normal(out=log_increments, dtype=S.dtype)
+    elif sampler == "antithetic":
+        # Pair the first half of the paths with their mirror images -Z.
+        # For an odd num_paths the middle path is left unpaired.
+        num_pairs = num_paths // 2
+        Z_half = rng.standard_normal((num_steps, num_paths - num_pairs), dtype=S.dtype)
+        log_increments[:, :num_paths - num_pairs] = Z_half
+        np.negative(Z_half[:, :num_pairs], out=log_increments[:, num_paths - num_pairs:])
+    else:  # 'sobol'
+        # Imported here because scipy.stats adds a noticeable start-up cost for the other samplers
+        from scipy.stats import norm, qmc
+        sobol = qmc.Sobol(d=num_steps, scramble=True, seed=rng)
+        log_increments[...] = norm.ppf(sobol.random_base2(m=int(num_paths).bit_length() - 1)).T
+    log_increments *= vol_sqrt_dt
+    log_increments += drift
+    S[0] = np.log(S0)
+    
+    # One cumulative sum and one vectorized exp over the whole matrix replace
+    # the per-time-step Python loop.
+    np.cumsum(S, axis=0, out=S)
+    np.exp(S, out=S)
+    S[0] = S0
 
     # --- 2. Backward Induction ---
     
-    # Calculate the intrinsic value (payoff) at each time step
-    intrinsic_value = np.maximum(0, K - S)
+    # Paths that are never in-the-money have a zero cash flow and never enter the
+    # regression. When most paths are like that (deep OTM), drop them once up front
+    # instead of re-scanning them every step.
+    ever_itm = S[1:].min(axis=0) < K
+    if ever_itm.mean() < ITM_COMPRESS_THRESHOLD:
+        S = np.compress(ever_itm, S, axis=1)
+    
+    # One-step discount factor, applied to the running cash flows at every step
+    step_discount = np.exp(-r * dt)
     
-    # Initialize cash flow matrix. This will store the cash flow at the exercise time for each path.
+    # Instead of a full (num_steps + 1, num_paths) cash flow matrix, we keep a single
+    # cash flow per path, discounted back to the current time step.
     # Initially, we assume exercise at maturity for all paths.
-    cash_flows = np.zeros_like(S)
-    cash_flows[:, -1] = intrinsic_value[:, -1]
+    disc_cf = np.maximum(0, K - S[-1])
+    
+    # The backward pass works on cache-sized blocks of paths. Each step makes two passes:
+    # the first accumulates the regression moments over all blocks, so the coefficients are
+    # still fitted on every ITM path, and the second applies the exercise rule block by block.
+    inv_K = 1.0 / K
+    blocks = [slice(start, start + BLOCK_SIZE) for start in range(0, S.shape[1], BLOCK_SIZE)]
     
     # Iterate backwards from the second-to-last time step to the first
     for t in range(num_steps - 1, 0, -1):
-        # Find paths that are "in-the-money" at the current time step.
-        # Regression is only performed on these paths, as there's no incentive
-        # to exercise an out-of-the-money option.
-        in_the_money_paths = np.where(intrinsic_value[:, t] > 0)[0]
+        # Power sums of x = S / K ([n, sum x, sum x^2, sum x^3, sum x^4]) and
+        # cross-moments with the discounted cash flows y ([sum y, sum x*y, sum x^2*y])
+        moments = np.zeros(5)
+        cross_moments = np.zeros(3)
         
-        # If no paths are in the money, there's nothing to do, so we continue.
-        if len(in_the_money_paths) == 0:
-            continue
+        for blk in blocks:
+            S_blk = S[t, blk]
+            disc_cf_blk = disc_cf[blk]
             
-        # Select the relevant stock prices (X values for regression)
-        X = S[in_the_money_paths, t]
-        
-        # Select the discounted future cash flows (Y values for regression)
-        # Find the next exercise time for each path from t+1 onwards
-        future_cash_flow_times = np.argmax(cash_flows[in_the_money_paths, t+1:], axis=1)
-        future_cash_flows = cash_flows[in_the_money_paths, t+1:][np.arange(len(in_the_money_paths)), future_cash_flow_times]
-        
-        # Discount these future cash flows back to the current time t
-        Y = future_cash_flows * np.exp(-r * (future_cash_flow_times + 1) * dt)
+            # Roll the cash flows back from t+1 to t
+            disc_cf_blk *= step_discount
+            
+            # Find paths that are "in-the-money" at the current time step.
+            # Regression is only performed on these paths, as there's no incentive
+            # to exercise an out-of-the-money option.
+            idx_itm = np.flatnonzero(S_blk < K)
+            
+            # Perform polynomial regression (e.g., degree 2)
+            # We use basis functions [1, x, x^2] with x = S / K, which keeps the
+            # moments well-scaled. For degree 2 the least-squares fit reduces to a
+            # 3x3 normal-equation solve on a handful of scalar moments, which is far
+            # cheaper than the Vandermonde + SVD done by np.polyfit.
+            x = np.multiply(S_blk[idx_itm], inv_K, dtype=np.float64)
+            y = disc_cf_blk[idx_itm]
+            x2 = x * x
+            moments += (idx_itm.size, x.sum(), x2.sum(), x2 @ x, x2 @ x2)
+            cross_moments += (y.sum(dtype=np.float64), x @ y, x2 @ y)
         
-        # Perform polynomial regression (e.g., degree 2)
-        # We use basis functions [1, S, S^2]
-        # np.polyfit finds coefficients [c2, c1, c0] for c2*X^2 + c1*X + c0
-        coeffs = np.polyfit(X, Y, 2)
+        # If no paths are in the money, there's nothing to do, so we continue.
+        if moments[0] == 0:
+            continue
         
-        # Estimate the continuation value for all in-the-money paths
-        continuation_value = np.polyval(coeffs, X)
+        # The normal-equation matrix is the Hankel matrix M[i, j] = sum x^(i+j)
+        M = moments[np.add.outer(np.arange(3), np.arange(3))]
+        # lstsq rather than solve: with fewer than three ITM paths M is singular
+        c0, c1, c2 = np.linalg.lstsq(M, cross_moments, rcond=None)[0]
         
         # --- 3. Optimal Exercise Decision ---
         
-        # Identify which paths should be exercised early
-        exercise_paths = in_the_money_paths[intrinsic_value[in_the_money_paths, t] > continuation_value]
-        
-        # For the paths we exercise early:
-        # - Set the cash flow at the current time t to the intrinsic value.
-        # - Zero out all future cash flows for these paths, as the option is now exercised.
-        if len(exercise_paths) > 0:
-            cash_flows[exercise_paths, t] = intrinsic_value[exercise_paths, t]
-            cash_flows[exercise_paths, t+1:] = 0
+        for blk in blocks:
+            S_blk = S[t, blk]
+            idx_itm = np.flatnonzero(S_blk < K)
+            X_itm = S_blk[idx_itm]
+            
+            # Estimate the continuation value for the in-the-money paths and
+            # identify which of them should be exercised early
+            x = np.multiply(X_itm, inv_K, dtype=np.float64)
+            continuation_value = c0 + x * (c1 + x * c2)
+            exercise_value = K - X_itm
+            exercise = exercise_value > continuation_value
+            
+            # For the paths we exercise early, scatter the intrinsic value back to the
+            # original path ids. This replaces any later cash flow on those paths.
+            disc_cf[blk][idx_itm[exercise]] = exercise_value[exercise]
 
     # --- 4. Pricing ---
     
-    # The final option price is the average of all discounted cash flows.
-    # Find the time of the first cash flow for each path.
-    first_cash_flow_times = np.argmax(cash_flows > 0, axis=1)
-    
-    # Get the corresponding cash flow values
-    final_cash_flows = cash_flows[np.arange(num_paths), first_cash_flow_times]
-    
-    # Discount them back to time 0
-    discount_factors = np.exp(-r * first_cash_flow_times * dt)
-    discounted_cash_flows = final_cash_flows * discount_factors
-    
-    # The price is the mean of these discounted cash flows
-    price = np.mean(discounted_cash_flows)
+    # The cash flows are now discounted back to t=1; one more step brings them to time 0.
+    # The price is the mean of these discounted cash flows over all paths, where the
+    # paths dropped for never being in-the-money contribute zero.
+    price = disc_cf.sum(dtype=np.float64) / num_paths * step_discount
     
     return price
\ No newline at end of file
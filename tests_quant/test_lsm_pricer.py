@@ -1,8 +1,11 @@
 # tests_quant/test_lsm_pricer.py
 
+import numpy as np
 import pytest
 from core.oracles import binomial_tree_american_vanilla
+from lsm_py import lsm_pricer
 from lsm_py.lsm_pricer import price_american_put_lsm
+from lsm_py.lsm_numba import price_american_put_lsm_numba, WorkArena
 
 def test_lsm_vs_binomial_tree():
     """
@@ -30,4 +33,119 @@ def test_lsm_vs_binomial_tree():
     # We check if the LSM result is within a certain tolerance of the oracle.
     # A 2% relative tolerance is reasonable for this number of paths.
     # pytest.approx handles the comparison gracefully.
-    assert calculated_price == pytest.approx(expected_price, rel=0.02)
\ No newline at end of file
+    assert calculated_price == pytest.approx(expected_price, rel=0.02)
+
+def test_lsm_numba_vs_binomial_tree():
+    """
+    Test the parallel Numba LSM pricer against the binomial tree oracle,
+    and check that a fixed seed gives a reproducible price.
+    """
+    S0, K, T, r, sigma = 100, 105, 1.0, 0.05, 0.2
+    expected_price = binomial_tree_american_vanilla(S0, K, T, r, sigma, 2000, "put")
+    
+    calculated_price = price_american_put_lsm_numba(S0, K, T, r, sigma, 20000, 100)
+    
+    assert calculated_price == pytest.approx(expected_price, rel=0.02)
+    assert price_american_put_lsm_numba(S0, K, T, r, sigma, 20000, 100) == pytest.approx(calculated_price, rel=1e-12)
+
+@pytest.mark.parametrize("pricer", [price_american_put_lsm, price_american_put_lsm_numba])
+def test_lsm_deep_otm_vs_binomial_tree(pricer):
+    """
+    Test a deep out-of-the-money put, where some time steps have fewer than three
+    in-the-money paths and the regression's normal equations are singular.
+    The price is tiny, so it is compared with an absolute tolerance.
+    """
+    S0, K, T, r, sigma = 100, 60, 1.0, 0.05, 0.2
+    expected_price = binomial_tree_american_vanilla(S0, K, T, r, sigma, 2000, "put")
+    
+    calculated_price = pricer(S0, K, T, r, sigma, 2000, 50)
+    
+    assert np.isfinite(calculated_price)
+    assert calculated_price == pytest.approx(expected_price, abs=0.02)
+
+def test_lsm_blocked_backward_pass(monkeypatch):
+    """
+    Splitting the backward pass into many path blocks must give the same price as a
+    single block for the same seed: the regression moments are summed across blocks
+    and the exercise decisions are scattered back to the right paths.
+    """
+    S0, K, T, r, sigma = 100, 105, 1.0, 0.05, 0.2
+    single_block_price = price_american_put_lsm(S0, K, T, r, sigma, 20000, 50)
+    
+    monkeypatch.setattr(lsm_pricer, "BLOCK_SIZE", 1000)
+    blocked_price = price_american_put_lsm(S0, K, T, r, sigma, 20000, 50)
+    
+    assert blocked_price == pytest.approx(single_block_price, rel=1e-12)
+
+def test_lsm_deep_otm_path_compression(monkeypatch):
+    """
+    For a deep out-of-the-money put most paths never enter the money and are dropped
+    before the backward pass. The dropped paths must still count as zero cash flows, so
+    the price matches both the oracle and a run with the compression switched off.
+    """
+    S0, K, T, r, sigma = 100, 60, 1.0, 0.05, 0.2
+    expected_price = binomial_tree_american_vanilla(S0, K, T, r, sigma, 2000, "put")
+    
+    compressed_price = price_american_put_lsm(S0, K, T, r, sigma, 20000, 50)
+    monkeypatch.setattr(lsm_pricer, "ITM_COMPRESS_THRESHOLD", 0.0)
+    uncompressed_price = price_american_put_lsm(S0, K, T, r, sigma, 20000, 50)
+    
+    assert compressed_price == pytest.approx(expected_price, abs=0.01)
+    assert compressed_price == pytest.approx(uncompressed_price, rel=1e-12)
+
+def test_lsm_float32_vs_binomial_tree():
+    """
+    Test that simulating the paths in single precision keeps the LSM price
+    within the same tolerance of the binomial tree oracle.
+    """
+    S0, K, T, r, sigma = 100, 105, 1.0, 0.05, 0.2
+    expected_price = binomial_tree_american_vanilla(S0, K, T, r, sigma, 2000, "put")
+    
+    calculated_price = price_american_put_lsm(S0, K, T, r, sigma, 20000, 100, dtype=np.float32)
+    
+    assert calculated_price == pytest.approx(expected_price, rel=0.02)
+
+def test_lsm_numba_arena_reuse():
+    """
+    Reusing a WorkArena across calls must not change the price, and an arena
+    of the wrong shape must be rejected.
+    """
+    S0, K, T, r, sigma = 100, 105, 1.0, 0.05, 0.2
+    arena = WorkArena(5000, 50)
+    
+    fresh_price = price_american_put_lsm_numba(S0, K, T, r, sigma, 5000, 50)
+    price_american_put_lsm_numba(S0, 95, T, r, 0.3, 5000, 50, arena=arena)
+    reused_price = price_american_put_lsm_numba(S0, K, T, r, sigma, 5000, 50, arena=arena)
+    
+    assert reused_price == fresh_price
+    with pytest.raises(ValueError):
+        price_american_put_lsm_numba(S0, K, T, r, sigma, 5000, 60, arena=arena)
+
+@pytest.mark.parametrize("sampler", ["antithetic", "sobol"])
+def test_lsm_variance_reduction_vs_binomial_tree(sampler):
+    """
+    Test the antithetic and Sobol' samplers against the binomial tree oracle, and check
+    that they actually reduce variance: the spread of prices across seeds must be clearly
+    below that of the plain pseudo-random sampler at the same path count.
+    """
+    S0, K, T, r, sigma = 100, 105, 1.0, 0.05, 0.2
+    expected_price = binomial_tree_american_vanilla(S0, K, T, r, sigma, 2000, "put")
+    
+    calculated_price = price_american_put_lsm(S0, K, T, r, sigma, 8192, 50, sampler=sampler)
+    
+    assert calculated_price == pytest.approx(expected_price, rel=0.02)
+    
+    seeds = range(8)
+    pseudo_std = np.std([price_american_put_lsm(S0, K, T, r, sigma, 8192, 50, seed=s) for s in seeds])
+    sampler_std = np.std([price_american_put_lsm(S0, K, T, r, sigma, 8192, 50, seed=s, sampler=sampler) for s in seeds])
+    assert sampler_std < 0.8 * pseudo_std
+
+def test_lsm_invalid_sampler():
+    """
+    An unknown sampler, or a Sobol' run whose path count is not a power of two, is rejected.
+    """
+    S0, K, T, r, sigma = 100, 105, 1.0, 0.05, 0.2
+    with pytest.raises(ValueError):
+        price_american_put_lsm(S0, K, T, r, sigma, 8192, 50, sampler="halton")
+    with pytest.raises(ValueError):
+        price_american_put_lsm(S0, K, T, r, sigma, 5000, 50, sampler="sobol")
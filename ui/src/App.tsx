@@ -11,8 +11,8 @@ const POLLING_INTERVAL = 1500;
 type SweepParameter = "S0" | "K" | "T" | "r" | "sigma" | "num_paths" | "num_steps";
 const allSweepableParams: SweepParameter[] = ["S0", "K", "T", "r", "sigma", "num_paths", "num_steps"];
 
-interface IResult { backend: string; inputs: any; outputs: { price: number; time_ms: number; }; }
-interface ITaskStatus { status: 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED'; results: IResult[] | null; progress?: string; }
+interface IResult { backend: string; inputs: any; outputs: { price: number; time_ms: number; }; cached?: boolean; }
+interface ITaskStatus { status: 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED'; results: IResult[] | null; progress?: string; system_info?: any; error?: string; }
 interface IBackend { key: string; name: string; }
 
 // --- Main App Component ---
@@ -46,8 +46,14 @@ function App() {
         if (taskId && task?.status !== 'COMPLETED' && task?.status !== 'FAILED') {
             const interval = setInterval(async () => {
                 try {
-                    const { data } = await axios.get<ITaskStatus>(`${API_URL}/task-status/${taskId}`);
-                    setTask(data);
+                    // Only fetch the results we have not accumulated yet
+                    const since = task?.results?.length ?? 0;
+                    const { data } = await axios.get<ITaskStatus>(`${API_URL}/task-status/${taskId}`, { params: { since } });
+                    setTask(prev => {
+                        const seen = prev?.results ?? [];
+                        const fresh = (data.results ?? []).slice(Math.max(0, seen.length - since));
+                        return { ...data, results: data.results === null ? null : [...seen, ...fresh] };
+                    });
                     if (data.status === 'COMPLETED' || data.status === 'FAILED') {
                         clearInterval(interval);
                         if (data.status === 'COMPLETED') setActiveTab('results');
@@ -110,9 +116,9 @@ function App() {
 
     const downloadCSV = () => {
         if (!task?.results) return;
-        const headers = ["backend", ...Object.keys(task.results[0].inputs), "price", "time_ms"];
+        const headers = ["backend", ...Object.keys(task.results[0].inputs), "price", "time_ms", "cached"];
         const rows = task.results.map(r => [
-            r.backend, ...Object.values(r.inputs), r.outputs.price, r.outputs.time_ms
+            r.backend, ...Object.values(r.inputs), r.outputs.price, r.outputs.time_ms, r.cached ?? false
         ].join(","));
         const csvContent = "data:text/csv;charset=utf-8," + [headers.join(","), ...rows].join("\n");
         const link = document.createElement("a");
@@ -198,10 +204,11 @@ function App() {
                     <div id="results-panel">
                         {!task ? <p>No experiment has been run yet.</p> :
                          isRunning ? <p className="status-message">Running: {task.progress || 'Please wait...'}</p> :
-                         task.status === 'FAILED' ? <p className="error-message">Experiment Failed! Check API logs.</p> :
+                         task.status === 'FAILED' ? <p className="error-message">Experiment Failed! {task.error ?? 'Check API logs.'}</p> :
                          task.status === 'COMPLETED' && task.results && task.results.length > 0 ? (
                             <>
                                 <div className="results-controls"><h3>{enableSweep ? `Sweep of '${sweep.parameter}'` : 'Single Run Comparison'}</h3><button onClick={downloadCSV}>Download Results as CSV</button></div>
+                                {task.results.some(r => r.cached) && <p className="status-message">{task.results.filter(r => r.cached).length} of {task.results.length} results were served from the cache; their times are from the original run.</p>}
                                 <ResponsiveContainer width="100%" height={500}>
                                     {enableSweep ? (
                                         <LineChart data={processedSweepData} margin={{ top: 20, right: 30, left: 20, bottom: 100 }}>